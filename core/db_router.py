@@ -0,0 +1,203 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the ``default`` alias. Reads go to the ``replica`` alias
+only inside a ``read_from_replica()`` block (or a view wrapped with
+``replica_view``), and only while the current request/command has not written
+anything. Once a write happens, reads stay on the primary for the rest of the
+request and, via a short-lived cookie, for the next few seconds so users see
+their own changes even if the replica is lagging.
+
+If no ``replica`` alias is configured, or it cannot be reached or errors on a
+read, reads fall back to the primary and the replica is retried after
+``REPLICA_RETRY_SECONDS``.
+
+Usage in a management command:
+
+    class Command(BaseCommand):
+        @read_from_replica()
+        def handle(self, *args, **options):
+            ...
+"""
+
+import logging
+import time
+from contextlib import ExitStack
+from functools import wraps
+
+from asgiref.local import Local
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_COOKIE_NAME = 'db_pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Per-thread (per-request) routing state
+_state = Local()
+# Shared replica health: while in the future, reads skip the replica
+_replica_retry_at = [0.0]
+
+
+def _mark_replica_down():
+    cooldown = getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+    _replica_retry_at[0] = time.monotonic() + cooldown
+    logger.warning("Replica database unavailable, reading from primary for %ss", cooldown, exc_info=True)
+    # Drop the broken connection so the next attempt reconnects from scratch
+    try:
+        connections[REPLICA_DB_ALIAS].close()
+    except DatabaseError:
+        pass
+
+
+def _replica_available():
+    if REPLICA_DB_ALIAS not in settings.DATABASES:
+        return False
+    if time.monotonic() < _replica_retry_at[0]:
+        return False
+    try:
+        connections[REPLICA_DB_ALIAS].ensure_connection()
+    except DatabaseError:
+        _mark_replica_down()
+        return False
+    return True
+
+
+def _record_writes(execute, sql, params, many, context):
+    # Any write pins the rest of this request/command to the primary
+    words = sql.lstrip().split(None, 1)
+    if words and words[0].upper() in WRITE_STATEMENTS:
+        _state.pinned = True
+        _state.wrote = True
+    return execute(sql, params, many, context)
+
+
+def _record_replica_errors(execute, sql, params, many, context):
+    # Remember which error the replica raised, so primary errors aren't blamed on it
+    try:
+        return execute(sql, params, many, context)
+    except DatabaseError as e:
+        _state.replica_error = e
+        raise
+
+
+class read_from_replica:
+    """
+    Send reads inside this block to the replica (unless pinned to primary).
+
+    A database error raised by the replica marks it down. Used as a decorator,
+    the function is then run once more against the primary, unless it already
+    wrote something; a plain ``with`` block re-raises, and the next attempt
+    reads from the primary. Errors from the primary are never retried.
+    """
+
+    def __enter__(self):
+        self._outer_wrote = getattr(_state, 'wrote', False)
+        _state.wrote = False
+        _state.depth = getattr(_state, 'depth', 0) + 1
+        self._stack = ExitStack()
+        self._stack.enter_context(connections[DEFAULT_DB_ALIAS].execute_wrapper(_record_writes))
+        if REPLICA_DB_ALIAS in settings.DATABASES:
+            self._stack.enter_context(connections[REPLICA_DB_ALIAS].execute_wrapper(_record_replica_errors))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stack.close()
+        _state.depth -= 1
+        # Outside a request nobody else resets the pin, so do it here
+        if not _state.depth and not getattr(_state, 'in_request', False):
+            _state.pinned = False
+        self.replica_failed = exc_value is not None and exc_value is getattr(_state, 'replica_error', None)
+        if not _state.depth:
+            _state.replica_error = None
+        self.wrote = _state.wrote
+        _state.wrote = self._outer_wrote or self.wrote
+        if self.replica_failed:
+            _mark_replica_down()
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def inner(*args, **kwargs):
+            return _call_with_fallback(func, *args, **kwargs)
+        return inner
+
+
+def _call_with_fallback(func, *args, **kwargs):
+    scope = read_from_replica()
+    try:
+        with scope:
+            return func(*args, **kwargs)
+    except DatabaseError:
+        # Re-running after a write would repeat it
+        if not scope.replica_failed or scope.wrote:
+            raise
+    # The replica is now marked down, so this run reads from the primary
+    return func(*args, **kwargs)
+
+
+def replica_view(view_func):
+    """Serve safe (GET/HEAD) requests to this view from the replica."""
+    def _render_view(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        # TemplateResponses query lazily, so render them while still routed
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        return response
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return view_func(request, *args, **kwargs)
+        return _call_with_fallback(_render_view, request, *args, **kwargs)
+    return _wrapped_view
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'depth', 0) or getattr(_state, 'pinned', False):
+            return DEFAULT_DB_ALIAS
+        if _replica_available():
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        dbs = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """Keep reads on the primary for non-safe requests and shortly after any write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.in_request = True
+        _state.wrote = False
+        _state.pinned = request.method not in SAFE_METHODS or PIN_COOKIE_NAME in request.COOKIES
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(_record_writes):
+                response = self.get_response(request)
+            wrote = _state.wrote
+        finally:
+            _state.in_request = False
+            _state.pinned = False
+            _state.wrote = False
+
+        if wrote:
+            response.set_cookie(
+                PIN_COOKIE_NAME, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 5),
+                httponly=True, samesite='Lax',
+            )
+        return response
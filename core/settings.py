@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', # Required for Render
+    'core.db_router.ReplicaStickinessMiddleware', # Read-your-writes for replica reads
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,6 +69,25 @@ DATABASES = {
     )
 }
 
+# Optional read replica for dashboards, admin lists and reporting commands.
+# To try it locally with two SQLite files:
+#   cp db.sqlite3 db_replica.sqlite3
+#   REPLICA_DATABASE_URL=sqlite:///db_replica.sqlite3 python manage.py runserver
+REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL')
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(REPLICA_DATABASE_URL, conn_max_age=600)
+    if DATABASES['replica']['ENGINE'] == 'django.db.backends.sqlite3':
+        # Read-only, so a wrong path errors out instead of creating an empty database
+        DATABASES['replica']['NAME'] = f"file:{DATABASES['replica']['NAME']}?mode=ro"
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+
+# Seconds to keep a user's reads on the primary after they write something
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+# Seconds to wait before retrying a replica that failed
+REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     { 'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator', },
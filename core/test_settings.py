@@ -0,0 +1,16 @@
+"""
+Django settings for running the test suite:
+
+    python manage.py test --settings=core.test_settings
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# Tests get their own replica database so they can tell which alias served a read
+DATABASES = {
+    **DATABASES,
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+    },
+}
@@ -1,17 +1,25 @@
 from django.contrib import admin
+from django.utils.decorators import method_decorator
+from core.db_router import replica_view
 from .models import User, StudentProfile, StudyTask, StudySession, TestExam, TestResult, LibraryLog, AppConfig
 
+# Changelists are read-heavy, so serve them from the read replica
+class ReplicaReadAdmin(admin.ModelAdmin):
+    @method_decorator(replica_view)
+    def changelist_view(self, request, extra_context=None):
+        return super().changelist_view(request, extra_context)
+
 # Custom Admin View for Users to see Roles easily
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(ReplicaReadAdmin):
     list_display = ('username', 'role', 'phone', 'link_code')
     list_filter = ('role',)
 
-class StudentProfileAdmin(admin.ModelAdmin):
+class StudentProfileAdmin(ReplicaReadAdmin):
     list_display = ('user', 'target_exam', 'is_library_member', 'is_azeez_class_student')
 
 admin.site.register(User, UserAdmin)
 admin.site.register(StudentProfile, StudentProfileAdmin)
-admin.site.register(TestExam)
-admin.site.register(TestResult)
-admin.site.register(LibraryLog)
-admin.site.register(AppConfig)
\ No newline at end of file
+admin.site.register(TestExam, ReplicaReadAdmin)
+admin.site.register(TestResult, ReplicaReadAdmin)
+admin.site.register(LibraryLog, ReplicaReadAdmin)
+admin.site.register(AppConfig, ReplicaReadAdmin)
\ No newline at end of file
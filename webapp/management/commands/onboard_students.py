@@ -0,0 +1,190 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from webapp.models import User, StudentProfile
+
+REQUIRED_COLUMNS = {'username', 'password', 'phone', 'current_class', 'target_exam'}
+
+
+def _setup_worker():
+    # Spawned workers (non-fork platforms) need Django loaded to hash passwords
+    import django
+    django.setup()
+
+
+def _describe(error):
+    if hasattr(error, 'error_dict'):
+        return '; '.join(f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items())
+    return ' '.join(error.messages)
+
+
+class Command(BaseCommand):
+    help = (
+        "Onboard students from a CSV roster. Columns: username, password, phone, "
+        "current_class, target_exam, and optionally first_name, last_name, board, "
+        "batch_id, parent_phone (links the student to an existing parent account)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('roster', help="Path to the roster CSV file")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Rows inserted per batch")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Password hashing processes")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        try:
+            roster = open(options['roster'], newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(f"Cannot open roster: {e}")
+
+        self.seen_usernames = set()
+        self.seen_phones = set()
+        self.issued_codes = set()
+        # Hash with this process's hasher so workers can't drift from settings
+        self.hash_password = partial(make_password, hasher=get_hasher())
+        totals = {'created': 0, 'linked': 0, 'skipped': 0}
+
+        with roster, ProcessPoolExecutor(max_workers=options['workers'], initializer=_setup_worker) as pool:
+            reader = csv.DictReader(roster)
+            missing = REQUIRED_COLUMNS - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"Roster is missing columns: {', '.join(sorted(missing))}")
+
+            first_row = 2  # Row 1 is the header
+            while True:
+                chunk = list(islice(reader, chunk_size))
+                if not chunk:
+                    break
+                created, linked, skipped = self.import_chunk(chunk, first_row, pool)
+                first_row += len(chunk)
+                totals['created'] += created
+                totals['linked'] += linked
+                totals['skipped'] += skipped
+                self.stdout.write(f"Created {totals['created']} students so far...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Onboarded {totals['created']} students "
+            f"({totals['linked']} linked to parents, {totals['skipped']} rows skipped)."
+        ))
+
+    def import_chunk(self, chunk, first_row, pool):
+        entries = []
+        skipped = 0
+        for row_num, row in enumerate(chunk, start=first_row):
+            row = {k: (v or '').strip() for k, v in row.items() if k}
+            try:
+                entries.append(self.build(row))
+            except ValidationError as e:
+                self.stderr.write(f"Row {row_num}: {_describe(e)}, skipped.")
+                skipped += 1
+
+        # Drop rows that clash with accounts already in the database
+        # (usernames case-insensitively, like signup's clean_username)
+        taken_usernames = set(User.objects.annotate(lower_username=Lower('username')).filter(
+            lower_username__in=[user.username.lower() for _, user, _ in entries],
+        ).values_list('lower_username', flat=True))
+        taken_phones = set(User.objects.filter(
+            phone__in=[user.phone for _, user, _ in entries]).values_list('phone', flat=True))
+        fresh = []
+        for entry in entries:
+            user = entry[1]
+            if user.username.lower() in taken_usernames or user.phone in taken_phones:
+                self.stderr.write(f"User {user.username}: username or phone already registered, skipped.")
+                skipped += 1
+            else:
+                fresh.append(entry)
+        if not fresh:
+            return 0, 0, skipped
+
+        parent_phones = {row['parent_phone'] for row, _, _ in fresh if row.get('parent_phone')}
+        parents = dict(User.objects.filter(
+            role='PARENT', phone__in=parent_phones).values_list('phone', 'id'))
+        for phone in parent_phones - parents.keys():
+            self.stderr.write(f"No parent account with phone {phone}, students left unlinked.")
+
+        hashes = pool.map(
+            self.hash_password, [row['password'] for row, _, _ in fresh],
+            chunksize=max(1, len(fresh) // 32),
+        )
+        codes = User.new_link_codes(len(fresh), exclude=self.issued_codes)
+        self.issued_codes |= codes
+
+        users = []
+        for (row, user, profile), password, code in zip(fresh, hashes, codes):
+            user.password = password
+            user.link_code = code
+            profile.parent_id = parents.get(row.get('parent_phone'))
+            users.append(user)
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            # Some backends don't return primary keys from bulk_create
+            if users[0].pk is None:
+                ids = dict(User.objects.filter(
+                    username__in=[u.username for u in users]).values_list('username', 'id'))
+                for user in users:
+                    user.pk = ids[user.username]
+            profiles = []
+            for _, user, profile in fresh:
+                profile.user = user
+                profiles.append(profile)
+            StudentProfile.objects.bulk_create(profiles)
+
+        linked = sum(1 for _, _, profile in fresh if profile.parent_id)
+        return len(users), linked, skipped
+
+    def build(self, row):
+        """Validate a roster row the way signup does and return (row, user, profile)."""
+        user = User(
+            username=row.get('username', ''),
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', ''),
+            role='STUDENT',
+            phone=row.get('phone', ''),
+        )
+        profile = StudentProfile(
+            current_class=row.get('current_class', ''),
+            board=row.get('board') or 'CBSE',
+            target_exam=row.get('target_exam', ''),
+            batch_id=row.get('batch_id', ''),
+        )
+
+        errors = {}
+        try:
+            # Uniqueness is checked in batch against the database afterwards
+            user.full_clean(exclude=['password', 'link_code'], validate_unique=False)
+        except ValidationError as e:
+            errors.update(e.message_dict)
+        try:
+            profile.full_clean(exclude=['user', 'parent'], validate_unique=False)
+        except ValidationError as e:
+            errors.update(e.message_dict)
+        try:
+            validate_password(row.get('password', ''), user)
+        except ValidationError as e:
+            errors['password'] = e.messages
+        if errors:
+            raise ValidationError(errors)
+
+        if user.username.lower() in self.seen_usernames:
+            raise ValidationError(f"duplicate username {user.username!r} in roster")
+        if user.phone in self.seen_phones:
+            raise ValidationError(f"duplicate phone {user.phone!r} in roster")
+        self.seen_usernames.add(user.username.lower())
+        self.seen_phones.add(user.phone)
+        return row, user, profile
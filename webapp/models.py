@@ -17,9 +17,20 @@ class User(AbstractUser):
     # Parent-Child Linking Code
     link_code = models.CharField(max_length=10, unique=True, blank=True, null=True)
 
+    @classmethod
+    def new_link_codes(cls, count, exclude=()):
+        """Return `count` distinct link codes not already used by any user."""
+        codes = set()
+        while len(codes) < count:
+            candidates = {str(uuid.uuid4())[:8].upper() for _ in range(count - len(codes))}
+            candidates -= set(exclude) | codes
+            taken = cls.objects.filter(link_code__in=candidates).values_list('link_code', flat=True)
+            codes |= candidates - set(taken)
+        return codes
+
     def save(self, *args, **kwargs):
         if not self.link_code:
-            self.link_code = str(uuid.uuid4())[:8].upper()
+            self.link_code = self.new_link_codes(1).pop()
         super().save(*args, **kwargs)
 
 # --- 2. PROFILES ---
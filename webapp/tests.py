@@ -1,3 +1,272 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+import uuid
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connections, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import db_router
+from core.db_router import PIN_COOKIE_NAME, PrimaryReplicaRouter, read_from_replica
+from .models import User, StudentProfile
+
+
+# --- DATABASE ROUTER ---
+@skipUnless('replica' in settings.DATABASES, "Run with --settings=core.test_settings")
+class ReplicaRouterTests(TestCase):
+    databases = {'default'} | ({'replica'} & settings.DATABASES.keys())
+
+    def setUp(self):
+        db_router._replica_retry_at[0] = 0.0
+        self.addCleanup(db_router._replica_retry_at.__setitem__, 0, 0.0)
+        self.router = PrimaryReplicaRouter()
+
+        self.parent = User.objects.create_user(username='parent', password='pw', role='PARENT', phone='900')
+        self.parent.save(using='replica')
+        # Different children on each side show which database served the dashboard
+        self.make_child('primary_kid', 'PrimaryKid', 'default')
+        self.make_child('replica_kid', 'ReplicaKid', 'replica')
+        self.client.force_login(self.parent)
+
+    def make_child(self, username, first_name, using):
+        child = User(username=username, first_name=first_name, role='STUDENT', phone=username, link_code=username[:8].upper())
+        child.save(using=using)
+        StudentProfile(user=child, parent=self.parent, current_class='10', board='CBSE', target_exam='NEET').save(using=using)
+
+    def test_dashboard_get_reads_from_replica(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'ReplicaKid')
+        self.assertNotContains(response, 'PrimaryKid')
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_write_pins_request_and_sets_cookie(self):
+        student = User.objects.create_user(username='new_kid', password='pw', phone='901')
+        profile = StudentProfile.objects.create(user=student, current_class='10', board='CBSE', target_exam='JEE')
+
+        response = self.client.post(reverse('link_child'), {'link_code': student.link_code})
+
+        self.assertRedirects(response, reverse('dashboard'))
+        self.assertEqual(response.cookies[PIN_COOKIE_NAME]['max-age'], settings.REPLICA_STICKY_SECONDS)
+        profile.refresh_from_db()
+        self.assertEqual(profile.parent, self.parent)
+
+    def test_pin_cookie_reads_from_primary(self):
+        self.client.cookies[PIN_COOKIE_NAME] = '1'
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'PrimaryKid')
+        self.assertNotContains(response, 'ReplicaKid')
+
+    def test_read_from_replica_outside_request(self):
+        self.assertEqual(self.router.db_for_read(User), 'default')
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(User), 'replica')
+            with read_from_replica():
+                User.objects.create(username='written', phone='902')
+                self.assertEqual(self.router.db_for_read(User), 'default')
+            # The write keeps the outer block on the primary too
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        self.assertEqual(db_router._state.depth, 0)
+        self.assertFalse(db_router._state.pinned)
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(User), 'replica')
+
+    def test_falls_back_when_replica_not_configured(self):
+        with mock.patch.dict(settings.DATABASES):
+            del settings.DATABASES['replica']
+            response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'PrimaryKid')
+
+    def test_falls_back_when_replica_unreachable(self):
+        with mock.patch.object(connections['replica'], 'ensure_connection', side_effect=OperationalError), \
+                self.assertLogs('core.db_router', 'WARNING'):
+            response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'PrimaryKid')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def break_replica(self):
+        with connections['replica'].cursor() as cursor:
+            cursor.execute('DROP TABLE webapp_studentprofile')
+
+    def test_falls_back_when_replica_query_fails(self):
+        self.break_replica()
+        with self.assertLogs('core.db_router', 'WARNING'):
+            response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'PrimaryKid')
+        # The replica stays marked down until the retry window passes
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_primary_errors_are_not_retried(self):
+        User(username='replica_only', phone='903').save(using='replica')
+        calls = []
+
+        @read_from_replica()
+        def read_then_write():
+            calls.append(User.objects.count())
+            User.objects.create(username='parent', phone='904')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            read_then_write()
+        # One run, whose read came from the replica (three users there, two on the primary)
+        self.assertEqual(calls, [3])
+        self.assertEqual(db_router._replica_retry_at[0], 0.0)
+
+    def test_replica_errors_after_a_write_are_not_retried(self):
+        calls = []
+
+        @read_from_replica()
+        def write_then_read():
+            calls.append(1)
+            User.objects.create(username='written', phone='903')
+            db_router._state.pinned = False  # Read from the replica despite the write
+            StudentProfile.objects.count()
+
+        self.break_replica()
+        with self.assertLogs('core.db_router', 'WARNING'), self.assertRaises(OperationalError):
+            write_then_read()
+        self.assertEqual(calls, [1])
+        self.assertGreater(db_router._replica_retry_at[0], 0.0)
+
+
+# --- BULK ONBOARDING ---
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class OnboardStudentsTests(TestCase):
+    def student(self, n, **extra):
+        row = {
+            'username': f'student{n}', 'password': f'Roster-pass-{n}', 'phone': f'98{n:08d}',
+            'current_class': '10', 'target_exam': 'NEET', 'first_name': f'Kid{n}',
+        }
+        row.update(extra)
+        return row
+
+    def onboard(self, rows, *args):
+        fieldnames = ['username', 'password', 'phone', 'current_class', 'target_exam',
+                      'first_name', 'board', 'batch_id', 'parent_phone']
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        out, err = StringIO(), StringIO()
+        call_command('onboard_students', path, '--workers', '1', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_students_and_profiles(self):
+        out, err = self.onboard([self.student(1), self.student(2, board='ICSE', batch_id='Batch A')])
+
+        self.assertIn("Onboarded 2 students", out)
+        self.assertEqual(err, '')
+        users = User.objects.filter(role='STUDENT')
+        self.assertEqual(users.count(), 2)
+        self.assertEqual(len({u.link_code for u in users}), 2)
+        self.assertTrue(all(u.link_code for u in users))
+        user = User.objects.get(username='student2')
+        self.assertTrue(user.check_password('Roster-pass-2'))
+        self.assertEqual(user.student_profile.board, 'ICSE')
+        self.assertEqual(user.student_profile.batch_id, 'Batch A')
+
+    def test_links_parents_by_phone(self):
+        parent = User.objects.create_user(username='parent', password='pw', role='PARENT', phone='900')
+        out, err = self.onboard([
+            self.student(1, parent_phone='900'),
+            self.student(2, parent_phone='555'),
+        ])
+
+        self.assertIn("1 linked to parents", out)
+        self.assertIn("No parent account with phone 555", err)
+        self.assertEqual(User.objects.get(username='student1').student_profile.parent, parent)
+        self.assertIsNone(User.objects.get(username='student2').student_profile.parent)
+
+    def test_skips_duplicates(self):
+        User.objects.create_user(username='student3', password='pw', phone='111')
+        User.objects.create_user(username='someone', password='pw', phone=self.student(4)['phone'])
+        out, err = self.onboard([
+            self.student(1),
+            self.student(1, phone='222'),  # Same username
+            self.student(2, phone=self.student(1)['phone']),  # Same phone
+            self.student(3),  # Username already registered
+            self.student(4),  # Phone already registered
+        ])
+
+        self.assertIn("Onboarded 1 students", out)
+        self.assertIn("4 rows skipped", out)
+        self.assertIn("duplicate username 'student1'", err)
+        self.assertIn("duplicate phone", err)
+        self.assertEqual(err.count("already registered"), 2)
+        self.assertEqual(StudentProfile.objects.count(), 1)
+
+    def test_usernames_are_case_insensitive(self):
+        User.objects.create_user(username='student1', password='pw', phone='111')
+        out, err = self.onboard([
+            self.student(1, username='Student1'),  # Differs from a registered user only in case
+            self.student(2),
+            self.student(3, username='STUDENT2'),  # Differs from an earlier row only in case
+        ])
+
+        self.assertIn("Onboarded 1 students", out)
+        self.assertIn("User Student1: username or phone already registered", err)
+        self.assertIn("duplicate username 'STUDENT2'", err)
+        self.assertFalse(User.objects.filter(username__in=['Student1', 'STUDENT2']).exists())
+
+    def test_skips_invalid_rows(self):
+        out, err = self.onboard([
+            self.student(1, phone='9' * 19),
+            self.student(2, username='bad name!'),
+            self.student(3, password='x'),
+            self.student(4, target_exam='MBA'),
+            self.student(5, current_class='Class 10 Science'),
+            self.student(6),
+        ])
+
+        self.assertIn("Onboarded 1 students", out)
+        self.assertIn("Row 2: phone:", err)
+        self.assertIn("Row 3: username:", err)
+        self.assertIn("Row 4: password:", err)
+        self.assertIn("Row 5: target_exam:", err)
+        self.assertIn("Row 6: current_class:", err)
+        self.assertQuerySetEqual(User.objects.values_list('username', flat=True), ['student6'])
+
+    def test_chunk_boundaries(self):
+        rows = [self.student(n) for n in range(1, 6)]
+        rows.append(self.student(1, phone='222'))  # Duplicate from an earlier chunk
+        out, err = self.onboard(rows, '--chunk-size', '2')
+
+        self.assertIn("Onboarded 5 students", out)
+        self.assertIn("Row 7: duplicate username 'student1'", err)
+        self.assertEqual(StudentProfile.objects.count(), 5)
+        self.assertEqual(User.objects.values('link_code').distinct().count(), 5)
+
+    def test_rerun_is_idempotent(self):
+        rows = [self.student(1), self.student(2)]
+        self.onboard(rows)
+        codes = set(User.objects.values_list('link_code', flat=True))
+
+        out, err = self.onboard(rows)
+
+        self.assertIn("Onboarded 0 students", out)
+        self.assertEqual(err.count("already registered"), 2)
+        self.assertEqual(set(User.objects.values_list('link_code', flat=True)), codes)
+        self.assertEqual(StudentProfile.objects.count(), 2)
+
+    def test_rejects_bad_options(self):
+        with self.assertRaisesMessage(CommandError, "--workers must be at least 1"):
+            self.onboard([self.student(1)], '--workers', '0')
+        with self.assertRaisesMessage(CommandError, "--chunk-size must be at least 1"):
+            self.onboard([self.student(1)], '--chunk-size', '0')
+
+
+class LinkCodeTests(TestCase):
+    def test_new_link_codes_skips_taken_codes(self):
+        User.objects.create(username='taken', phone='900', link_code='AAAAAAAA')
+        fresh = [uuid.UUID('aaaaaaaa-0000-0000-0000-000000000000'),
+                 uuid.UUID('cccccccc-0000-0000-0000-000000000000'),
+                 uuid.UUID('bbbbbbbb-0000-0000-0000-000000000000')]
+        with mock.patch('webapp.models.uuid.uuid4', side_effect=fresh):
+            codes = User.new_link_codes(1, exclude={'CCCCCCCC'})
+        self.assertEqual(codes, {'BBBBBBBB'})
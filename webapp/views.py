@@ -5,6 +5,7 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.contrib.auth import login
 from dotenv import load_dotenv
+from core.db_router import replica_view
 
 # Import Models and Forms
 from .models import *
@@ -37,6 +38,7 @@ def signup(request):
 
 # --- DASHBOARD ---
 @login_required
+@replica_view
 def dashboard(request):
     user = request.user
     if user.role == 'PARENT':